@@ -2,37 +2,83 @@
 
 import builtins
 from datetime import UTC, datetime as _datetime, timedelta
+from functools import lru_cache
 import re
-from secrets import randbelow
+from secrets import randbelow, randbits
 import string
-from time import sleep
+from threading import Lock
+from time import time_ns
 from typing import Optional
 from uuid import UUID
 
+def _decode7(digits: bytes) -> int:
+  result = 0
+  for digit in digits: result = result * 62 + digit
+  return result
+##
+
+def _decode_table() -> bytes:
+  table = bytearray(256)
+  for (index, char) in enumerate(_ALPHABET): table[ord(char)] = index
+  return bytes(table)
+##
+
+def _from_int(value: int) -> 'Zid':
+  buffer = bytearray(b'Z000000_0000000_0000000')
+  for index in _DIGIT_INDICES:
+    (value, remainder) = divmod(value, 62)
+    buffer[index] = _ALPHABET_BYTES[remainder]
+  ##
+  if value: buffer[0] = ord('z')
+  return str.__new__(Zid, buffer.decode('ascii'))
+##
+
+def _random_offset() -> int:
+  while _VALUES_PER_MICRO <= (value := randbits(_VALUES_PER_MICRO_BITS)): pass
+  return value
+##
+
 def _values_per_micro() -> int:
   last_date = _datetime(year = 9999, month = 12, day = 31, tzinfo = UTC)
   delta = (last_date - _FIRST_DATE) + timedelta(days = 1)
-  return ((1 << 120) // (1_000_000 * int(delta.total_seconds()))) + 1
+  return (_UPPER_BOUND // (1_000_000 * int(delta.total_seconds()))) + 1
+##
+
+@lru_cache(maxsize = 4096)
+def _zid_bytes(zid: str) -> bytes:
+  digits = zid.encode('ascii').translate(_DECODE)
+  value = int(zid.startswith('z')) * 62 ** 6 + _decode7(digits[1:7])
+  value = (value * _B62_7 + _decode7(digits[8:15])) * _B62_7 + _decode7(digits[16:])
+  return value.to_bytes(length = 15)
 ##
 
 __all__ = ['Zid']
 _ALPHABET = ''.join(sorted(string.printable[:62]))
+_ALPHABET_BYTES = _ALPHABET.encode('ascii')
+_B62_7 = 62 ** 7
+_DECODE = _decode_table()
+_DIGIT_INDICES = tuple(index for index in range(22, 0, -1) if index not in (7, 15))
 _FIRST_DATE = _datetime(year = 1, month = 1, day = 1, tzinfo = UTC)
+_EPOCH_MICROS = (_datetime.fromtimestamp(0, tz = UTC) - _FIRST_DATE) // timedelta(microseconds = 1)
 _LAST_VALUE = 'zszWVIy_ZES2MJo_AMUmjwV'  # Zid.from_bytes(b'\xff' * 15)
+_NOW_LOCK = Lock()
 _RE = re.compile('[Zz][0-9A-Za-z]{6}_[0-9A-Za-z]{7}_[0-9A-Za-z]{7}$')
-_UUID_HEX_RE = re.compile('[0-9a-f]{12}8[0-9a-f]{3}8[0-9a-f]{15}')
+_UPPER_BOUND = 1 << 120
+_UUID_VERSION_BITS = (0x8 << 76) | (0x8 << 60)
+_UUID_VERSION_MASK = (0xf << 76) | (0xf << 60)
 _VALUES_PER_MICRO = _values_per_micro()
+_VALUES_PER_MICRO_BITS = _VALUES_PER_MICRO.bit_length()
 
 class Zid(str):
   """Zids are chronologically-ordered unique identifiers."""
 
   __slots__ = ()
-  _previous_now: Optional[_datetime] = None
+  _previous_micros: int = 0
 
   def __new__(cls, value: Optional[str] = None, /) -> 'Zid':
     if cls is not Zid: raise TypeError
     if isinstance(value, Zid): return value
-    if value is None: return Zid.from_datetime(Zid._now())
+    if value is None: return Zid.from_micros(Zid._now())
     if (not _RE.fullmatch(str_value := str(value))) or (_LAST_VALUE < str_value):
       raise ValueError(f'Invalid Zid: {value!r}')
     ##
@@ -40,10 +86,12 @@ class Zid(str):
   ##
 
   @staticmethod
-  def _now() -> _datetime:
-    while Zid._previous_now == (now := _datetime.now(tz = UTC)): sleep(1e-6)
-    Zid._previous_now = now
-    return now
+  def _now() -> int:
+    micros = time_ns() // 1000 + _EPOCH_MICROS
+    with _NOW_LOCK:
+      micros = Zid._previous_micros = max(micros, Zid._previous_micros + 1)
+    ##
+    return micros
   ##
 
   @staticmethod
@@ -51,15 +99,7 @@ class Zid(str):
     """Loads a Zid from its 15-byte representation."""
     if not isinstance(value, bytes): raise TypeError
     if len(value) != 15: raise ValueError(f'Expected 15 bytes, got {len(value)}')
-    int_value = int.from_bytes(value)
-    digits = []
-    for index in range(20):
-      (int_value, remainder) = divmod(int_value, 62)
-      digits.append(_ALPHABET[remainder])
-      if index % 7 == 6: digits.append('_')
-    ##
-    digits.append('Zz'[int_value])
-    return Zid(''.join(reversed(digits)))
+    return _from_int(int.from_bytes(value))
   ##
 
   @staticmethod
@@ -67,32 +107,37 @@ class Zid(str):
     """Creates a new Zid for the given datetime."""
     if not isinstance(value, _datetime): raise TypeError
     if not value.tzinfo: raise ValueError('Expected a timezone-aware datetime')
-    int_value = (delta := value - _FIRST_DATE).microseconds
-    delta = timedelta(days = delta.days, seconds = delta.seconds)
-    int_value += 1_000_000 * int(delta.total_seconds())
-    int_value *= _VALUES_PER_MICRO
-    int_value += randbelow(min(_VALUES_PER_MICRO, (1 << 120) - int_value))
-    return Zid.from_bytes(int_value.to_bytes(length = 15))
+    delta = value - _FIRST_DATE
+    return Zid.from_micros(
+      delta.days * 86_400_000_000 + delta.seconds * 1_000_000 + delta.microseconds)
+  ##
+
+  @staticmethod
+  def from_micros(micros: int, /) -> 'Zid':
+    """Creates a new Zid for the given microseconds since 0001-01-01 UTC."""
+    if isinstance(micros, bool) or not isinstance(micros, int): raise TypeError
+    int_value = micros * _VALUES_PER_MICRO
+    if not 0 <= int_value < _UPPER_BOUND: raise ValueError(f'Microseconds out of range: {micros}')
+    if int_value + _VALUES_PER_MICRO <= _UPPER_BOUND: int_value += _random_offset()
+    else: int_value += randbelow(_UPPER_BOUND - int_value)
+    return _from_int(int_value)
   ##
 
   @staticmethod
   def from_uuid(uuid: UUID) -> 'Zid':
     """Loads a Zid from its UUID representation."""
-    hex_str = uuid.hex
-    if not _UUID_HEX_RE.fullmatch(hex_str): raise ValueError(f'Invalid Zid UUID: {uuid!r}')
-    return Zid.from_bytes(bytes.fromhex(hex_str[:12] + hex_str[13:16] + hex_str[17:]))
+    value = uuid.int
+    if value & _UUID_VERSION_MASK != _UUID_VERSION_BITS:
+      raise ValueError(f'Invalid Zid UUID: {uuid!r}')
+    ##
+    value = (value >> 80 << 72) | ((value >> 64) & 0xfff) << 60 | (value & ((1 << 60) - 1))
+    return _from_int(value)
   ##
 
   @property
   def bytes(self) -> bytes:
     """Returns the 15-byte representation of this Zid."""
-    value = int(self.startswith('z'))
-    for digit in self[1:]:
-      if digit == '_': continue
-      value *= 62
-      value += _ALPHABET.index(digit)
-    ##
-    return value.to_bytes(length = 15)
+    return _zid_bytes(str(self))
   ##
 
   @property
@@ -105,8 +150,9 @@ class Zid(str):
   @property
   def uuid(self) -> UUID:
     """Returns the version 8 UUID representation of this Zid."""
-    hex_str = hex(int.from_bytes(self.bytes) + (1 << 120))
-    return UUID(hex = f'{hex_str[3:15]}8{hex_str[15:18]}8{hex_str[18:]}')
+    value = int.from_bytes(self.bytes)
+    value = (value >> 72 << 80) | ((value >> 60) & 0xfff) << 64 | (value & ((1 << 60) - 1))
+    return UUID(int = value | _UUID_VERSION_BITS)
   ##
 ##
 